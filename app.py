@@ -1,13 +1,25 @@
 import os
+import io
 import json
-from flask import Flask, request, jsonify, render_template, redirect, url_for, flash, send_file
+import asyncio
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
+from typing_extensions import TypedDict
+from flask import Flask, Response, abort, make_response, request, jsonify, render_template, redirect, url_for, flash, send_file, stream_with_context
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
 from dotenv import load_dotenv
 import google.generativeai as genai
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
+from google.generativeai import client as genai_client
+import redis
+from requests.adapters import HTTPAdapter
+from rq import Queue
+from sqlalchemy import event, insert, literal, select, text, update
+from sqlalchemy.orm import Session, object_session
 from config import Config
-from models import db, User, Interview, Answer
+from models import db, User, LoggedInUser, Interview, Answer
+from reports import render_interview_pdf
 
 load_dotenv()
 
@@ -21,18 +33,242 @@ login_manager.login_view = 'login'
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    # Cache-aside di Redis. Hit maupun miss sama-sama menghasilkan LoggedInUser, jadi current_user konsisten
+    cache_key = f"user:{user_id}"
+    if redis_client:
+        try:
+            cached = redis_client.get(cache_key)
+            if cached:
+                return LoggedInUser(**json.loads(cached))
+        except redis.RedisError as e:
+            print(f"Redis error: {e}")
+    user = db.session.get(User, int(user_id))
+    if user is None:
+        return None
+    data = user.to_dict()
+    if redis_client:
+        try:
+            redis_client.setex(cache_key, app.config['USER_CACHE_TTL'], json.dumps(data))
+        except redis.RedisError as e:
+            print(f"Redis error: {e}")
+    return LoggedInUser(**data)
+
+# Key cache user dihapus setelah commit, bukan saat flush: jika dihapus sebelum commit, cache miss
+# konkuren bisa membaca baris lama dan menyimpannya lagi selama USER_CACHE_TTL.
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def mark_cached_user_stale(mapper, connection, user):
+    object_session(user).info.setdefault('stale_user_ids', set()).add(user.id)
+
+@event.listens_for(Session, 'after_commit')
+def invalidate_cached_users(session):
+    user_ids = session.info.pop('stale_user_ids', None)
+    if user_ids and redis_client:
+        try:
+            redis_client.delete(*(f"user:{user_id}" for user_id in user_ids))
+        except redis.RedisError as e:
+            print(f"Redis error: {e}")
+
+@event.listens_for(Session, 'after_rollback')
+def forget_stale_users(session):
+    session.info.pop('stale_user_ids', None)
+
+# Transport default SDK memakai grpc untuk klien sync (generate_content, stream) dan grpc.aio untuk klien
+# async (batcher). Nilai grpc/grpc_asyncio eksplisit dipakai kedua klien, sehingga salah satunya gagal.
+if app.config['GEMINI_TRANSPORT'] not in (None, 'rest'):
+    raise RuntimeError(f"GEMINI_TRANSPORT={app.config['GEMINI_TRANSPORT']} tidak didukung, kosongkan atau gunakan 'rest'")
 
 # Configure Gemini API
 if app.config['GEMINI_API_KEY']:
-    genai.configure(api_key=app.config['GEMINI_API_KEY'])
-    model = genai.GenerativeModel('gemini-pro')
+    genai.configure(api_key=app.config['GEMINI_API_KEY'], transport=app.config['GEMINI_TRANSPORT'])
+    # Semua model memakai satu klien default SDK. grpc sudah multipleks di satu channel HTTP/2; untuk REST,
+    # pool keep-alive requests (default 10 koneksi) diperbesar agar request konkuren di worker gevent
+    # tidak membuang koneksi dan membuka handshake TLS baru. Atribut privat: cek ulang saat upgrade SDK.
+    if app.config['GEMINI_TRANSPORT'] == 'rest':
+        gemini_session = genai_client.get_default_generative_client()._transport._session
+        gemini_session.mount('https://', HTTPAdapter(pool_maxsize=app.config['GEMINI_POOL_SIZE']))
 else:
-    model = None  # Fallback jika no API key
     print("Warning: GEMINI_API_KEY not set. Using mock evaluation.")
 
+# Klien async Gemini (grpc.aio) terikat ke satu event loop, jadi semua panggilannya dijalankan
+# di satu loop background agar channel dipakai bersama. Thread request menunggu lewat future.result().
+_gemini_loop = None
+_gemini_loop_lock = threading.Lock()
+
+def get_gemini_loop():
+    global _gemini_loop
+    with _gemini_loop_lock:
+        if _gemini_loop is None:
+            _gemini_loop = asyncio.new_event_loop()
+            threading.Thread(target=_gemini_loop.run_forever, name='gemini-loop', daemon=True).start()
+    return _gemini_loop
+
+class GeminiBatcher:
+    """Kumpulkan prompt yang sudah antre, lalu kirim serentak dengan gather.
+
+    SDK belum punya endpoint batch, jadi tiap prompt tetap satu RPC; kelas ini titik kait untuk API batch
+    nanti. Karena itu jendela tunggu (GEMINI_BATCH_WINDOW_MS) default 0: menunggu hanya menambah latensi.
+    Hanya dipakai dari loop Gemini (lihat get_gemini_loop).
+    """
+
+    def __init__(self, window_ms, max_batch):
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.queue = None
+
+    async def submit(self, model, prompt):
+        loop = asyncio.get_running_loop()
+        if self.queue is None:
+            self.queue = asyncio.Queue()
+            loop.create_task(self._drain())
+        future = loop.create_future()
+        self.queue.put_nowait((model, prompt, future))
+        return await future
+
+    async def _drain(self):
+        while True:
+            batch = [await self.queue.get()]
+            if self.window:
+                await asyncio.sleep(self.window)
+            while len(batch) < self.max_batch and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            # Batch dikirim sebagai task terpisah agar batch berikutnya tidak menunggu
+            asyncio.get_running_loop().create_task(self._dispatch(batch))
+
+    async def _dispatch(self, batch):
+        results = await asyncio.gather(
+            *(model.generate_content_async(prompt, request_options=GEMINI_REQUEST_OPTIONS) for model, prompt, _ in batch),
+            return_exceptions=True
+        )
+        for (_, _, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+gemini_batcher = GeminiBatcher(app.config['GEMINI_BATCH_WINDOW_MS'], app.config['GEMINI_BATCH_SIZE'])
+
+class CircuitOpenError(Exception):
+    pass
+
+class CircuitBreaker:
+    """Buka sirkuit setelah fail_max kegagalan beruntun; selama reset_timeout panggilan langsung ditolak.
+
+    Setelah reset_timeout satu panggilan percobaan diizinkan: sukses menutup sirkuit, gagal membukanya lagi.
+    """
+
+    def __init__(self, fail_max, reset_timeout):
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.opened_at = time.monotonic()  # Panggilan lain tetap ditolak selama percobaan berjalan
+            return True
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.failures >= self.fail_max:
+                self.opened_at = time.monotonic()
+
+gemini_breaker = CircuitBreaker(app.config['GEMINI_BREAKER_FAIL_MAX'], app.config['GEMINI_BREAKER_RESET_TIMEOUT'])
+GEMINI_REQUEST_OPTIONS = {'timeout': app.config['GEMINI_TIMEOUT']}  # Panggilan macet tidak menahan worker selamanya
+
+@contextmanager
+def record_gemini_call():
+    # Hasil panggilan Gemini (termasuk iterasi stream sampai habis) dicatat ke circuit breaker
+    try:
+        yield
+    except Exception:
+        gemini_breaker.record_failure()
+        raise
+    gemini_breaker.record_success()
+
+def generate_content(stage, prompt):
+    if not gemini_breaker.allow():
+        raise CircuitOpenError("Gemini circuit breaker open")
+    model = STAGE_MODELS.get(stage, STAGE_MODELS['HR'])
+    with record_gemini_call():
+        if app.config['GEMINI_TRANSPORT'] == 'rest':
+            # Transport REST hanya punya klien sync; di worker gevent socket-nya sudah kooperatif
+            return model.generate_content(prompt, request_options=GEMINI_REQUEST_OPTIONS)
+        future = asyncio.run_coroutine_threadsafe(gemini_batcher.submit(model, prompt), get_gemini_loop())
+        return future.result()
+
+def stream_content(stage, prompt):
+    # Potongan teks Gemini satu per satu, lewat klien sync di semua transport yang didukung.
+    # gemini_breaker.allow() dicek pemanggil sebelum stream dimulai (lihat submit_answer_stream).
+    model = STAGE_MODELS.get(stage, STAGE_MODELS['HR'])
+    with record_gemini_call():
+        for chunk in model.generate_content(prompt, stream=True, request_options=GEMINI_REQUEST_OPTIONS):
+            yield chunk.text
+
+# Cache respons Gemini di Redis (opsional), key: tahap + role + pertanyaan + jawaban ternormalisasi.
+# Klien sync dipakai karena GET/SETEX sub-milidetik dan tetap kooperatif di worker gevent.
+redis_client = redis.Redis.from_url(app.config['REDIS_URL']) if app.config['REDIS_URL'] else None
+MIN_CACHEABLE_ANSWER_LENGTH = 20  # Jawaban sangat pendek tidak di-cache agar cache tidak tercemar
+
+def evaluation_cache_key(stage, job_role, question, answer):
+    raw = f"{stage}|{job_role}|{question}|{answer.strip().lower()}"
+    return "gemini:" + hashlib.sha256(raw.encode()).hexdigest()
+
+def get_cached_evaluation(key):
+    try:
+        cached = redis_client.get(key)
+    except redis.RedisError as e:
+        print(f"Redis error: {e}")
+        return None
+    return json.loads(cached) if cached else None
+
+def cache_evaluation(key, parsed):
+    try:
+        redis_client.setex(key, app.config['GEMINI_CACHE_TTL'], json.dumps(parsed))
+    except redis.RedisError as e:
+        print(f"Redis error: {e}")
+
+def gemini_rate_limited(user_id):
+    # Fixed window per menit: INCR + EXPIRE dalam satu round-trip. Jika Redis bermasalah, request tetap diizinkan.
+    if not redis_client:
+        return False
+    key = f"rl:{user_id}:{int(time.time() // 60)}"
+    try:
+        count, _ = redis_client.pipeline().incr(key).expire(key, 60).execute()
+    except redis.RedisError as e:
+        print(f"Redis error: {e}")
+        return False
+    return count > app.config['GEMINI_RATE_LIMIT']
+
+# PDF laporan dirender oleh worker RQ (rq worker reports) agar tidak memblokir worker web
+report_queue = Queue('reports', connection=redis_client) if redis_client else None
+
+def report_cache_key(interview_id, answer_count):
+    # Jawaban hanya ditambah, jadi jumlah jawaban cukup sebagai versi laporan
+    return f"report:{interview_id}:{answer_count}"
+
+def build_report(interview_id, cache_key):
+    # Dijalankan di worker RQ
+    with app.app_context():
+        pdf = render_interview_pdf(db.session.get(Interview, interview_id))
+    redis_client.setex(cache_key, app.config['REPORT_CACHE_TTL'], pdf)
+
 # Data simulasi: Job roles dan pertanyaan per tahap
-JOB_ROLES = ["Data Scientist", "Software Engineer", "IT Support", "UI/UX Designer"]
+JOB_ROLES_LIST = ("Data Scientist", "Software Engineer", "IT Support", "UI/UX Designer")  # Urutan untuk template
+JOB_ROLES = frozenset(JOB_ROLES_LIST)  # Validasi O(1)
 
 QUESTIONS = {
     "HR": {
@@ -55,37 +291,68 @@ QUESTIONS = {
     }
 }
 
-# Prompt templates untuk Gemini (adaptif per tahap)
-PROMPT_TEMPLATES = {
+# Satu dict probe per request: (tahap, role) -> pertanyaan
+QUESTIONS_FLAT = {(stage, role): question for stage, by_role in QUESTIONS.items() for role, question in by_role.items()}
+
+# System instruction untuk Gemini (adaptif per tahap). Bagian statis ini dikirim sebagai
+# system instruction model per tahap, prompt per request (build_prompt) hanya berisi posisi, pertanyaan, dan jawaban.
+STAGE_INSTRUCTIONS = {
     "HR": """
-    Anda adalah pewawancara HR. Evaluasi jawaban untuk posisi '{job_role}'.
-    Pertanyaan: "{question}"
-    Jawaban: "{answer}"
+    Anda adalah pewawancara HR. Evaluasi jawaban kandidat untuk posisi yang disebutkan.
     Nilai berdasarkan motivasi, cultural fit, dan komunikasi (skor 1-5).
     Deteksi elemen STAR dasar.
-    Output HARUS JSON valid: {{"score": <int 1-5>, "feedback": "<feedback konstruktif>", "star_elements_detected": {{"situation": <bool>, "task": <bool>, "action": <bool>, "result": <bool>}}}}
     """,
     "Behavioral": """
-    Anda adalah pewawancara behavioral. Evaluasi menggunakan metode STAR lengkap untuk '{job_role}'.
-    Pertanyaan: "{question}"
-    Jawaban: "{answer}"
+    Anda adalah pewawancara behavioral. Evaluasi menggunakan metode STAR lengkap untuk posisi yang disebutkan.
     Skor 1-5 berdasarkan kelengkapan STAR dan soft skills (teamwork, problem-solving).
-    Output HARUS JSON valid: {{"score": <int 1-5>, "feedback": "<feedback spesifik>", "star_elements_detected": {{"situation": <bool>, "task": <bool>, "action": <bool>, "result": <bool>}}}}
     """,
     "Technical": """
-    Anda adalah pewawancara teknis. Evaluasi akurasi dan relevansi untuk '{job_role}'.
-    Pertanyaan: "{question}"
-    Jawaban: "{answer}"
+    Anda adalah pewawancara teknis. Evaluasi akurasi dan relevansi untuk posisi yang disebutkan.
     Skor 1-5 berdasarkan pemahaman konsep teknis. Deteksi STAR jika relevan.
-    Output HARUS JSON valid: {{"score": <int 1-5>, "feedback": "<feedback teknis>", "star_elements_detected": {{"situation": <bool>, "task": <bool>, "action": <bool>, "result": <bool>}}}}
     """
 }
 
+# f-string dikompilasi saat import, jadi tidak ada parsing format spec per request seperti str.format
+def build_prompt(job_role, question, answer):
+    return f"""
+Posisi: '{job_role}'
+Pertanyaan: "{question}"
+Jawaban: "{answer}"
+"""
+
+# Skema output evaluasi. Dipakai sebagai response_schema sehingga Gemini selalu mengembalikan JSON valid.
+class StarElements(TypedDict):
+    situation: bool
+    task: bool
+    action: bool
+    result: bool
+
+class Evaluation(TypedDict):
+    score: int  # 1-5
+    feedback: str
+    star_elements_detected: StarElements
+
+EVALUATION_CONFIG = genai.GenerationConfig(response_mime_type='application/json', response_schema=Evaluation)
+
+# Model per tahap dibuat sekali saat startup. Context caching Gemini butuh minimal ribuan
+# token, jauh di atas ukuran instruksi ini, jadi system instruction dipakai langsung.
+if app.config['GEMINI_API_KEY']:
+    STAGE_MODELS = {
+        stage: genai.GenerativeModel('gemini-1.5-flash', system_instruction=instruction, generation_config=EVALUATION_CONFIG)
+        for stage, instruction in STAGE_INSTRUCTIONS.items()
+    }
+else:
+    STAGE_MODELS = {}  # Fallback jika no API key
+
 # Routes
 @app.route('/init_db')  # Opsional: Jalankan sekali untuk create tables
 def init_db():
     with app.app_context():
         db.create_all()
+        # create_all tidak menambah index ke tabel yang sudah ada
+        for table in db.metadata.tables.values():
+            for index in table.indexes:
+                index.create(db.engine, checkfirst=True)
     return "Database tables created!"
 
 @app.route('/', methods=['GET', 'POST'])
@@ -100,46 +367,196 @@ def index():
         interview = Interview(user_id=current_user.id, job_role=job_role, stage=stage)
         db.session.add(interview)
         db.session.commit()
-        question = QUESTIONS[stage][job_role]
-        return render_template('index.html', job_role=job_role, stage=stage, question=question, interview_id=interview.id, job_roles=JOB_ROLES)
-    return render_template('index.html', job_roles=JOB_ROLES)
+        question = QUESTIONS_FLAT[(stage, job_role)]
+        return render_template('index.html', job_role=job_role, stage=stage, question=question, interview_id=interview.id, job_roles=JOB_ROLES_LIST)
+    return render_template('index.html', job_roles=JOB_ROLES_LIST)
+
+MOCK_EVALUATION = {"score": 4, "feedback": "Mock feedback: Jawaban baik, tapi tambah detail STAR.", "star_elements_detected": {"situation": True, "task": True, "action": False, "result": True}}
+
+def circuit_open_response():
+    # Sirkuit terbuka: tolak tanpa menulis ke DB, klien diminta mencoba lagi setelah reset_timeout
+    result = jsonify({"error": "AI evaluation unavailable"})
+    result.headers['Retry-After'] = str(int(gemini_breaker.reset_timeout))
+    return result, 503
+
+def json_abort(message, status):
+    abort(make_response(jsonify({"error": message}), status))
+
+def read_submission(interview_id):
+    # Klien hanya mengirim jawaban (dan tahap opsional). Role dan pertanyaan kanonik diambil dari server,
+    # sehingga prompt tidak bisa disusupi teks pertanyaan dari klien.
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        json_abort("Invalid JSON", 400)
+    answer = data.get('answer')
+    if not isinstance(answer, str):
+        json_abort("Missing data", 400)
+    answer = answer.strip()
+    if not answer:
+        json_abort("Missing data", 400)
+    if len(answer) > app.config['MAX_ANSWER_LENGTH']:
+        json_abort("Answer too long", 400)
+    interview = db.session.query(Interview.job_role, Interview.stage) \
+        .filter_by(id=interview_id, user_id=current_user.id).first()
+    # Akhiri transaksi lookup agar koneksi pool tidak tertahan (idle in transaction) selama panggilan Gemini
+    db.session.close()
+    if interview is None:
+        json_abort("Unauthorized", 403)
+    stage = data.get('stage')
+    if not (isinstance(stage, str) and stage in QUESTIONS):
+        stage = interview.stage
+    return stage, QUESTIONS_FLAT[(stage, interview.job_role)], answer, interview.job_role
+
+def submission_cache_key(stage, job_role, question, answer):
+    if redis_client and len(answer.strip()) >= MIN_CACHEABLE_ANSWER_LENGTH:
+        return evaluation_cache_key(stage, job_role, question, answer)
+    return None
+
+def save_answer(interview_id, stage, question, answer, parsed):
+    star = parsed.get('star_elements_detected', {})
+    if db.engine.dialect.name == 'postgresql':
+        # Jawaban append-only dan boleh hilang jika crash dalam hitungan detik: commit tidak menunggu fsync WAL
+        db.session.execute(text("SET LOCAL synchronous_commit = off"))
+    # Kepemilikan dicek ulang di INSERT ... SELECT: transaksi lookup di read_submission sudah ditutup,
+    # jadi interview bisa saja terhapus selama panggilan Gemini
+    owned_interview = select(
+        Interview.id,
+        literal(question, db.Text),
+        literal(answer, db.Text),
+        literal(parsed.get('score', 0), db.Float),
+        literal(parsed.get('feedback', ''), db.Text),
+        literal(bool(star.get('situation')), db.Boolean),
+        literal(bool(star.get('task')), db.Boolean),
+        literal(bool(star.get('action')), db.Boolean),
+        literal(bool(star.get('result')), db.Boolean),
+        literal(stage, db.String)
+    ).where(Interview.id == interview_id, Interview.user_id == current_user.id)
+    inserted = db.session.execute(insert(Answer).from_select(
+        ['interview_id', 'question', 'answer_text', 'score', 'feedback',
+         'star_situation', 'star_task', 'star_action', 'star_result', 'stage'],
+        owned_interview
+    ))
+    if not inserted.rowcount:
+        return False
+    # Agregat skor dipelihara di baris interview dalam transaksi yang sama, dashboard tidak perlu scan answer
+    db.session.execute(update(Interview).where(Interview.id == interview_id).values(
+        total_score=Interview.total_score + parsed.get('score', 0),
+        answer_count=Interview.answer_count + 1
+    ))
+    db.session.commit()
+    return True
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
 @app.route('/submit_answer/<int:interview_id>', methods=['POST'])
 @login_required
 def submit_answer(interview_id):
-    data = request.get_json()
-    stage = data.get('stage', 'HR')
-    question = data.get('question')
-    answer = data.get('answer')
-    job_role = data.get('job_role')
+    stage, question, answer, job_role = read_submission(interview_id)
 
-    if not all([question, answer, job_role]):
-        return jsonify({"error": "Missing data"}), 400
+    cache_key = submission_cache_key(stage, job_role, question, answer)
+    cached = get_cached_evaluation(cache_key) if cache_key else None
+    cache_status = None  # Header X-Cache hanya dikirim jika cache benar-benar dibaca atau diisi
 
+    if cached is not None:
+        parsed = cached
+        cache_status = 'HIT'
     # Mock evaluation jika no Gemini
-    if not model:
-        parsed = {"score": 4, "feedback": "Mock feedback: Jawaban baik, tapi tambah detail STAR.", "star_elements_detected": {"situation": True, "task": True, "action": False, "result": True}}
+    elif not STAGE_MODELS:
+        parsed = MOCK_EVALUATION
+
+    elif gemini_rate_limited(current_user.id):
+        return jsonify({"error": "Too many requests"}), 429
 
     else:
-        prompt_template = PROMPT_TEMPLATES.get(stage, PROMPT_TEMPLATES['HR'])
-        prompt = prompt_template.format(job_role=job_role, question=question, answer=answer)
+        prompt = build_prompt(job_role, question, answer)
         try:
-            response = model.generate_content(prompt)
-            gemini_output = response.text.strip()
-            parsed = json.loads(gemini_output)
-        except (json.JSONDecodeError, Exception) as e:
+            response = generate_content(stage, prompt)
+            parsed = json.loads(response.text)
+            if cache_key:
+                cache_evaluation(cache_key, parsed)
+                cache_status = 'MISS'
+        except CircuitOpenError:
+            return circuit_open_response()
+        except Exception as e:
+            # Evaluasi gagal tidak disimpan agar tidak mencemari total_score/answer_count; klien boleh kirim ulang
             print(f"Gemini error: {e}")
-            parsed = {"score": 3, "feedback": f"Error parsing AI response: {gemini_output[:100]}. Coba lagi.", "star_elements_detected": {"situation": False, "task": False, "action": False, "result": False}}
+            return jsonify({"error": "AI evaluation unavailable"}), 503
 
     # Simpan ke DB
-    interview = Interview.query.get(interview_id)
-    if interview and interview.user_id == current_user.id:
-        new_answer = Answer(
-            interview_id=interview_id,
-            question=question,
-            answer_text=answer,
-            score=parsed.get('score', 0),
-            feedback=parsed.get('feedback', ''),
-            star_detected=json.dumps(parsed.get('star_elements_detected', {})),
-            stage=stage
-        )
\ No newline at end of file
+    if save_answer(interview_id, stage, question, answer, parsed):
+        result = jsonify(parsed)
+        if cache_status:
+            result.headers['X-Cache'] = cache_status
+        return result
+    return jsonify({"error": "Unauthorized"}), 403
+
+@app.route('/submit_answer/<int:interview_id>/stream', methods=['POST'])
+@login_required
+def submit_answer_stream(interview_id):
+    # Sama seperti submit_answer, tapi output Gemini dikirim bertahap lewat Server-Sent Events:
+    # event "chunk" untuk tiap potongan teks, lalu event "result" berisi evaluasi final.
+    # Kepemilikan sudah dicek di read_submission, karena status 403 tidak bisa dikirim setelah stream dimulai.
+    stage, question, answer, job_role = read_submission(interview_id)
+
+    cache_key = submission_cache_key(stage, job_role, question, answer)
+    cached = get_cached_evaluation(cache_key) if cache_key else None
+    if cached is None and STAGE_MODELS:
+        if gemini_rate_limited(current_user.id):
+            return jsonify({"error": "Too many requests"}), 429
+        # Dicek sebelum stream dimulai agar status 503 masih bisa dikirim
+        if not gemini_breaker.allow():
+            return circuit_open_response()
+
+    def events():
+        if cached is not None:
+            parsed = cached
+        elif not STAGE_MODELS:
+            parsed = MOCK_EVALUATION
+        else:
+            chunks = []
+            try:
+                for text in stream_content(stage, build_prompt(job_role, question, answer)):
+                    chunks.append(text)
+                    yield sse_event('chunk', text)
+                parsed = json.loads(''.join(chunks))
+                if cache_key:
+                    cache_evaluation(cache_key, parsed)
+            except Exception as e:
+                print(f"Gemini error: {e}")
+                yield sse_event('error', "AI evaluation unavailable")
+                return
+        if not save_answer(interview_id, stage, question, answer, parsed):
+            yield sse_event('error', "Unauthorized")
+            return
+        yield sse_event('result', parsed)
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/interview/<int:interview_id>/report')
+@login_required
+def interview_report(interview_id):
+    # 200 + PDF jika sudah siap, selain itu 202 + job_id; klien polling URL yang sama
+    answer_count = db.session.query(Interview.answer_count) \
+        .filter(Interview.id == interview_id, Interview.user_id == current_user.id).scalar()
+    if answer_count is None:
+        return jsonify({"error": "Unauthorized"}), 403
+    download_name = f"interview_{interview_id}.pdf"
+
+    # Tanpa Redis: render langsung di request
+    if not report_queue:
+        pdf = render_interview_pdf(db.session.get(Interview, interview_id))
+        return send_file(io.BytesIO(pdf), mimetype='application/pdf', download_name=download_name)
+
+    cache_key = report_cache_key(interview_id, answer_count)
+    try:
+        pdf = redis_client.get(cache_key)
+        if pdf:
+            return send_file(io.BytesIO(pdf), mimetype='application/pdf', download_name=download_name)
+        job = report_queue.fetch_job(cache_key)
+        if job is None or job.is_failed:
+            job = report_queue.enqueue(build_report, interview_id, cache_key, job_id=cache_key)
+    except redis.RedisError as e:
+        print(f"Redis error: {e}")
+        return jsonify({"error": "Report service unavailable"}), 503
+    return jsonify({"job_id": job.id, "status_url": url_for('interview_report', interview_id=interview_id)}), 202
@@ -7,4 +7,20 @@ class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-fallback'
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///instance/interveew.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
\ No newline at end of file
+    SQLALCHEMY_ENGINE_OPTIONS = {'pool_pre_ping': True}
+    if not SQLALCHEMY_DATABASE_URI.startswith('sqlite'):
+        SQLALCHEMY_ENGINE_OPTIONS['pool_size'] = int(os.environ.get('DB_POOL_SIZE', 20))
+    GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
+    GEMINI_TRANSPORT = os.environ.get('GEMINI_TRANSPORT') or None  # Kosong (default SDK: grpc + grpc.aio) atau rest
+    REDIS_URL = os.environ.get('REDIS_URL')  # Opsional, mis. redis://localhost:6379/0
+    GEMINI_CACHE_TTL = int(os.environ.get('GEMINI_CACHE_TTL', 86400))  # Detik
+    GEMINI_BATCH_WINDOW_MS = int(os.environ.get('GEMINI_BATCH_WINDOW_MS', 0))
+    GEMINI_BATCH_SIZE = int(os.environ.get('GEMINI_BATCH_SIZE', 32))
+    REPORT_CACHE_TTL = int(os.environ.get('REPORT_CACHE_TTL', 86400))  # Detik
+    GEMINI_TIMEOUT = float(os.environ.get('GEMINI_TIMEOUT', 8))  # Detik per panggilan Gemini
+    GEMINI_RATE_LIMIT = int(os.environ.get('GEMINI_RATE_LIMIT', 10))  # Panggilan per user per menit (butuh Redis)
+    GEMINI_BREAKER_FAIL_MAX = int(os.environ.get('GEMINI_BREAKER_FAIL_MAX', 5))
+    GEMINI_BREAKER_RESET_TIMEOUT = int(os.environ.get('GEMINI_BREAKER_RESET_TIMEOUT', 30))  # Detik
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', 300))  # Detik
+    MAX_ANSWER_LENGTH = int(os.environ.get('MAX_ANSWER_LENGTH', 8192))  # Karakter, membatasi token input Gemini
+    GEMINI_POOL_SIZE = int(os.environ.get('GEMINI_POOL_SIZE', 200))  # Koneksi keep-alive ke Gemini (transport REST)
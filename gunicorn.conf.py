@@ -0,0 +1,14 @@
+import multiprocessing
+
+# Beban kerja didominasi I/O (Gemini + DB), satu worker gevent melayani banyak request
+worker_class = 'gevent'
+workers = multiprocessing.cpu_count() * 2 + 1
+worker_connections = 1000
+
+# wsgi.py menjalankan monkey patch dan memaksa transport Gemini REST: gunicorn -c gunicorn.conf.py
+wsgi_app = 'wsgi:app'
+
+def on_starting(server):
+    # App dari CLI (mis. app:app) melewati pengecekan transport di wsgi.py, grpc tidak kooperatif dengan gevent
+    if server.app.app_uri != wsgi_app:
+        raise RuntimeError(f"Worker gevent harus memuat {wsgi_app}, bukan {server.app.app_uri}")
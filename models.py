@@ -1,35 +1,69 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.security import check_password_hash
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
 
 db = SQLAlchemy()
+password_hasher = PasswordHasher(time_cost=2, memory_cost=19456, parallelism=1)
 
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(150), unique=True, nullable=False)
     email = db.Column(db.String(150), unique=True, nullable=False)
-    password_hash = db.Column(db.String(128), nullable=False)
+    password_hash = db.Column(db.String(255), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        if not self.password_hash.startswith('$argon2'):
+            # Hash PBKDF2 lama dari Werkzeug: verifikasi lalu upgrade ke argon2 (di-commit oleh pemanggil)
+            if not check_password_hash(self.password_hash, password):
+                return False
+            self.set_password(password)
+            return True
+        try:
+            password_hasher.verify(self.password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+        if password_hasher.check_needs_rehash(self.password_hash):
+            self.set_password(password)
+        return True
+
+    def to_dict(self):
+        # Tanpa password_hash: dipakai untuk cache user_loader
+        return {"id": self.id, "username": self.username, "email": self.email}
 
     def __repr__(self):
         return f'<User {self.username}>'
 
+class LoggedInUser(UserMixin):
+    # current_user dari user_loader: hanya field to_dict(), bukan model terpetakan (tanpa relasi seperti interviews).
+    # View yang butuh data lain harus query sendiri dengan current_user.id.
+    def __init__(self, id, username, email):
+        self.id = id
+        self.username = username
+        self.email = email
+
+    def __repr__(self):
+        return f'<LoggedInUser {self.username}>'
+
 class Interview(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     job_role = db.Column(db.String(100), nullable=False)
     stage = db.Column(db.String(20), default='HR')  # HR, Behavioral, Technical
-    total_score = db.Column(db.Float, default=0.0)
+    total_score = db.Column(db.Float, default=0.0)  # Jumlah skor jawaban, diperbarui bersama insert Answer
+    answer_count = db.Column(db.Integer, nullable=False, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     user = db.relationship('User', backref=db.backref('interviews', lazy=True))
 
+    # Juga melayani lookup per user_id (kolom terdepan), jadi tidak perlu index terpisah
+    __table_args__ = (db.Index('ix_interview_user_created', 'user_id', 'created_at'),)
+
 class Answer(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     interview_id = db.Column(db.Integer, db.ForeignKey('interview.id'), nullable=False)
@@ -37,7 +71,18 @@ class Answer(db.Model):
     answer_text = db.Column(db.Text, nullable=False)
     score = db.Column(db.Float)
     feedback = db.Column(db.Text)
-    star_detected = db.Column(db.Text)  # JSON string: {"situation": true, ...}
+    # Elemen STAR terdeteksi, kolom terpisah agar bisa diagregasi langsung di SQL
+    star_situation = db.Column(db.Boolean, nullable=False, default=False)
+    star_task = db.Column(db.Boolean, nullable=False, default=False)
+    star_action = db.Column(db.Boolean, nullable=False, default=False)
+    star_result = db.Column(db.Boolean, nullable=False, default=False)
     stage = db.Column(db.String(20), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    interview = db.relationship('Interview', backref=db.backref('answers', lazy=True))
\ No newline at end of file
+    interview = db.relationship('Interview', backref=db.backref('answers', lazy='selectin'))  # Satu query WHERE IN untuk semua interview
+
+    @property
+    def star_elements(self):
+        return {"situation": self.star_situation, "task": self.star_task, "action": self.star_action, "result": self.star_result}
+
+    # Juga melayani join/lookup per interview_id (kolom terdepan)
+    __table_args__ = (db.Index('ix_answer_interview_stage', 'interview_id', 'stage'),)
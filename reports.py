@@ -0,0 +1,31 @@
+import io
+from xml.sax.saxutils import escape
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+
+# Style sheet dibuat sekali per proses (worker), bukan per PDF
+STYLES = getSampleStyleSheet()
+
+def render_interview_pdf(interview):
+    """Render laporan wawancara (semua jawaban dan feedback) ke bytes PDF."""
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter, title=f"INTERVEEW - Interview #{interview.id}")
+    story = [
+        Paragraph("INTERVEEW - Laporan Wawancara", STYLES['Title']),
+        Paragraph(f"Role: {escape(interview.job_role)}", STYLES['Normal']),
+        Paragraph(f"Tanggal: {interview.created_at:%d-%m-%Y %H:%M}", STYLES['Normal']),
+        Spacer(1, 12),
+    ]
+    for answer in interview.answers:
+        detected = ", ".join(element.upper() for element, found in answer.star_elements.items() if found) or "-"
+        story += [
+            Paragraph(f"Tahap {escape(answer.stage)} - Skor {answer.score or 0:g}/5", STYLES['Heading2']),
+            Paragraph(f"<b>Pertanyaan:</b> {escape(answer.question)}", STYLES['Normal']),
+            Paragraph(f"<b>Jawaban:</b> {escape(answer.answer_text)}", STYLES['Normal']),
+            Paragraph(f"<b>Feedback:</b> {escape(answer.feedback or '')}", STYLES['Normal']),
+            Paragraph(f"<b>Elemen STAR:</b> {detected}", STYLES['Normal']),
+            Spacer(1, 12),
+        ]
+    doc.build(story)
+    return buffer.getvalue()
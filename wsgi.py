@@ -0,0 +1,18 @@
+# Entry point gunicorn dengan worker gevent: gunicorn -c gunicorn.conf.py
+# Monkey patch HARUS dijalankan sebelum import lain agar socket requests/urllib3 kooperatif.
+from gevent import monkey
+monkey.patch_all()
+
+import os
+
+try:
+    from psycogreen.gevent import patch_psycopg
+    patch_psycopg()  # Koneksi psycopg2 (Postgres) non-blocking
+except ImportError:
+    pass  # psycopg2 tidak terpasang, mis. pakai SQLite
+
+# grpc tidak kooperatif dengan gevent, pakai transport REST (requests). Transport lain ditolak saat startup.
+if os.environ.setdefault('GEMINI_TRANSPORT', 'rest') != 'rest':
+    raise RuntimeError(f"GEMINI_TRANSPORT={os.environ['GEMINI_TRANSPORT']} tidak didukung di worker gevent, gunakan 'rest'")
+
+from app import app